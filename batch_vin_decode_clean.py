@@ -7,11 +7,19 @@ import pandas as pd
 import re
 from sqlalchemy import create_engine
 from dotenv import load_dotenv
+from scraper_sources import VEHICLE_DATA_COLUMNS
+from listing_store import ListingStore
 
 load_dotenv()
 
 mode = os.getenv('MODE')
 print(mode)
+
+# 'append' reads undecoded rows from vehicle_data, 'entity' reads the listing store's change feed
+LISTING_STORE = os.getenv('LISTING_STORE', 'append')
+
+# Change-feed consumer name for this stage
+FEED_CONSUMER = 'decode'
     
 def create_db_engine():
     dbname = os.getenv('PROD_DB_NAME')
@@ -66,15 +74,27 @@ def parse_vin_response(data):
             vins.append(result['VIN'])
     return results, vins
 
+def fetch_stored_vin_details(engine, cleaned_data_table, vins):
+    # Make/Model/Year/Trim already decoded for these VINs, from their latest cleaned row
+    if not vins:
+        return pd.DataFrame(columns=['VIN', 'Make', 'Model', 'Year', 'Trim'])
+    return pd.read_sql(f"""
+        SELECT DISTINCT ON ("VIN") "VIN", "Make", "Model", "Year", "Trim"
+        FROM {cleaned_data_table} WHERE "VIN" = ANY(%(vins)s)
+        ORDER BY "VIN", "TimeStamp" DESC
+    """, engine, params={'vins': vins})
+
 # Function for cleaning and mapping data
 def clean_and_map_data(df):
-    # Cleaning "Car Price" column
-    df['CarPrice'] = df['CarPrice'].replace('[^\d.]+', '', regex=True)
+    # Cleaning "Car Price" column (skipped when the column is already numeric)
+    if not pd.api.types.is_numeric_dtype(df['CarPrice']):
+        df['CarPrice'] = df['CarPrice'].replace('[^\d.]+', '', regex=True)
     df['CarPrice'] = pd.to_numeric(df['CarPrice'], errors='coerce')
 
     # Cleaning "Car Mileage" column
-    df['CarMileage'] = df['CarMileage'].str.replace(',', '').str.replace(' mi\.', '', regex=True)
-    df['CarMileage'] = df['CarMileage'].replace('–', pd.NA)
+    if not pd.api.types.is_numeric_dtype(df['CarMileage']):
+        df['CarMileage'] = df['CarMileage'].str.replace(',', '').str.replace(' mi\.', '', regex=True)
+        df['CarMileage'] = df['CarMileage'].replace('–', pd.NA)
     df['CarMileage'] = pd.to_numeric(df['CarMileage'], errors='coerce')
 
     # Color mapping
@@ -178,10 +198,24 @@ def main():
     data_table = 'vehicle_data_test_env' if mode == 'test' else 'vehicle_data'
     cleaned_data_table = 'cleaned_vehicle_data_test_env' if mode == 'test' else 'cleaned_vehicle_data'
 
-    # Fetch only records where DecodeFlag is False
-    df = pd.read_sql(f'SELECT * FROM {data_table} WHERE "DecodeFlag" = false', engine)
-
-    vin_details_df, decoded_vins = fetch_vin_details(df)
+    if LISTING_STORE == 'entity':
+        # Only listings that are new or changed since this stage last ran
+        feed_connection = engine.raw_connection()
+        store = ListingStore(feed_connection, '_test_env' if mode == 'test' else '')
+        changed_rows, last_observation_id = store.read_changed_listings(FEED_CONSUMER)
+        df = pd.DataFrame(changed_rows, columns=VEHICLE_DATA_COLUMNS)
+        data_table = store.listings_table
+
+        # A price, mileage or ZIP change doesn't change what a VIN decodes to: reuse the
+        # details already in the cleaned table and only send NHTSA the VINs it hasn't decoded
+        stored_details_df = fetch_stored_vin_details(engine, cleaned_data_table, df['VIN'].dropna().tolist())
+        vin_details_df, decoded_vins = fetch_vin_details(df[~df['VIN'].isin(stored_details_df['VIN'])])
+        vin_details_df = pd.concat([stored_details_df, vin_details_df], ignore_index=True)
+        decoded_vins += stored_details_df['VIN'].tolist()
+    else:
+        # Fetch only records where DecodeFlag is False
+        df = pd.read_sql(f'SELECT * FROM {data_table} WHERE "DecodeFlag" = false', engine)
+        vin_details_df, decoded_vins = fetch_vin_details(df)
 
 
     # Debugging: Print columns of both dataframes
@@ -205,8 +239,15 @@ def main():
     df = df[df['_merge'] == 'left_only'].drop(columns=['_merge'])
     df.to_sql(cleaned_data_table, engine, if_exists='append', index=False)
 
+    if LISTING_STORE == 'entity':
+        # Acknowledge the changes only once they're loaded; VINs NHTSA couldn't decode are
+        # acknowledged too and come back the next time their listing changes
+        if last_observation_id is not None:
+            store.commit_changes(FEED_CONSUMER, last_observation_id)
+        feed_connection.close()
+
     # Update the DecodeFlag for decoded VINs
-    if decoded_vins:
+    elif decoded_vins:
         update_query = f'UPDATE {data_table} SET "DecodeFlag" = true WHERE "VIN" IN ({",".join(["%s"] * len(decoded_vins))})'
         with engine.connect() as conn:
             conn.execute(update_query, decoded_vins)
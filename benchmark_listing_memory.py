@@ -0,0 +1,81 @@
+import random
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+from listing_batch import ListingBatch
+
+# Memory per listing held in process during a scrape run: the old 14-element
+# lists of raw strings (all_car_data) against a ListingBatch, and the Arrow
+# table built from it when pyarrow is installed.
+
+COLORS = ["Black Clearcoat", "Platinum White", "Magnetic Gray Metallic", "Ruby Red", "Blue", "Silver"]
+INTERIORS = ["Black", "Gray", "Beige", "Ebony"]
+DRIVETRAINS = ["Front-wheel Drive", "All-wheel Drive", "Four-wheel Drive", "Rear-wheel Drive"]
+FUEL_TYPES = ["Gasoline", "Hybrid", "Electric", "Diesel"]
+TRANSMISSIONS = ["8-Speed Automatic", "CVT", "6-Speed Manual", "10-Speed Automatic"]
+ENGINES = ["2.0L I4 16V GDI DOHC Turbo", "3.5L V6 24V GDI SOHC", "1.5L I4 16V MPFI DOHC", "Electric"]
+
+def scraped_rows(count, rng):
+    # Fresh string objects per row, as BeautifulSoup's .text.strip() would return
+    start = datetime(2024, 1, 1, 8)
+    for i in range(count):
+        yield {
+            'CarName': f"20{rng.randint(10, 24)} Make Model Trim {rng.randint(1, 500)}",
+            'CarPrice': f"${rng.randint(8, 80) * 500:,}",
+            'CarMileage': f"{rng.randint(0, 150_000):,} mi.",
+            'ExteriorColor': ''.join(rng.choice(COLORS)),
+            'InteriorColor': ''.join(rng.choice(INTERIORS)),
+            'Drivetrain': ''.join(rng.choice(DRIVETRAINS)),
+            'FuelType': ''.join(rng.choice(FUEL_TYPES)),
+            'Transmission': ''.join(rng.choice(TRANSMISSIONS)),
+            'Engine': ''.join(rng.choice(ENGINES)),
+            'VIN': f"1C4GJXAN2LW{i:06d}",
+            'TimeStamp': start + timedelta(seconds=i),
+            'Source': ''.join("Cars.com"),
+            'ZipLocation': f"{rng.randint(10000, 10500)}",
+            'DecodeFlag': False,
+        }
+
+def as_list(row):
+    return [
+        row['CarName'], row['CarPrice'], row['CarMileage'], row['ExteriorColor'],
+        row['InteriorColor'], row['Drivetrain'], row['FuelType'], row['Transmission'],
+        row['Engine'], row['VIN'], row['TimeStamp'], row['Source'], row['ZipLocation'], row['DecodeFlag']
+    ]
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory per listing for scraped row representations")
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    def build_lists():
+        return [as_list(row) for row in scraped_rows(args.rows, random.Random(0))]
+
+    def build_batch():
+        batch = ListingBatch()
+        batch.extend(scraped_rows(args.rows, random.Random(0)))
+        return batch
+
+    lists, list_bytes = measure(build_lists)
+    del lists
+    batch, batch_bytes = measure(build_batch)
+
+    print(f"{args.rows:,} listings")
+    print(f"List of lists: {list_bytes / args.rows:8.1f} bytes/listing  {list_bytes / 1e6:8.1f} MB")
+    print(f"ListingBatch:  {batch_bytes / args.rows:8.1f} bytes/listing  {batch_bytes / 1e6:8.1f} MB  ({list_bytes / batch_bytes:.1f}x smaller)")
+
+    try:
+        table = batch.to_arrow()
+    except ImportError:
+        return
+    print(f"Arrow table:   {table.nbytes / args.rows:8.1f} bytes/listing  {table.nbytes / 1e6:8.1f} MB")
+
+if __name__ == '__main__':
+    main()
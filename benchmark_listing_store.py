@@ -0,0 +1,154 @@
+import os
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from scraper_sources import VEHICLE_DATA_COLUMNS
+from listing_batch import COPY_OPTIONS, ListingBatch, to_csv
+from listing_store import ListingStore, plan_upsert
+
+# Compares the append-only vehicle_data pattern with the listing store on a
+# simulated month of scrapes: storage (rows and COPY-format bytes) and the
+# client-side cost of preparing each side's COPY data. Ingest throughput needs
+# a server: with --database the same batches are loaded into '_bench' tables on
+# the configured PostgreSQL server and timed end to end.
+
+def simulate_scrapes(inventory, days, seen_fraction, turnover, rng):
+    # Yields one list of vehicle_data row dicts per day. Listings are re-seen from their
+    # home ZIP and sometimes a neighbouring one, prices and mileage change occasionally,
+    # and a share of the inventory sells and is replaced every day.
+    next_vin = 0
+    listings = {}
+
+    def new_listing():
+        nonlocal next_vin
+        next_vin += 1
+        zip_code = f"{rng.randint(10000, 99999)}"
+        return {
+            'CarName': f"20{rng.randint(10, 24)} Make Model {rng.randint(1, 200)}", 'CarPrice': rng.randint(8, 80) * 500,
+            'CarMileage': rng.randint(0, 150_000), 'ExteriorColor': 'Black', 'InteriorColor': 'Gray',
+            'Drivetrain': 'All-wheel Drive', 'FuelType': 'Gasoline', 'Transmission': '8-Speed Automatic',
+            'Engine': '2.0L I4 16V GDI DOHC Turbo', 'VIN': f"VIN{next_vin:014d}", 'Source': 'Cars.com',
+            'ZipLocation': zip_code, 'Zips': [zip_code, f"{int(zip_code) + 1:05d}"], 'DecodeFlag': False,
+        }
+
+    for _ in range(inventory):
+        listing = new_listing()
+        listings[listing['VIN']] = listing
+
+    start = datetime(2024, 1, 1, 8)
+    for day in range(days):
+        rows = []
+        for listing in listings.values():
+            if rng.random() < 0.05:
+                listing['CarPrice'] -= 500
+            if rng.random() < 0.02:
+                listing['CarMileage'] += rng.randint(5, 50)
+            if rng.random() > seen_fraction:
+                continue
+            for zip_code in listing['Zips'][:1 + (rng.random() < 0.3)]:
+                row = {column: listing.get(column) for column in VEHICLE_DATA_COLUMNS}
+                row['CarPrice'] = f"${listing['CarPrice']:,}"
+                row['CarMileage'] = f"{listing['CarMileage']:,} mi."
+                row['ZipLocation'] = zip_code
+                row['TimeStamp'] = start + timedelta(days=day, seconds=len(rows))
+                rows.append(row)
+        yield rows
+
+        for vin in rng.sample(list(listings), int(len(listings) * turnover)):
+            del listings[vin]
+            listing = new_listing()
+            listings[listing['VIN']] = listing
+
+def load_database(batches):
+    import psycopg2
+
+    connection = psycopg2.connect(dbname=os.getenv('PROD_DB_NAME'), user=os.getenv('PROD_DB_USER'), password=os.getenv('PROD_DB_PASS'), host=os.getenv('PROD_DB_HOST'))
+    store = ListingStore(connection, '_bench')
+    with connection.cursor() as cursor:
+        for table in [store.listings_table, store.observations_table, store.offsets_table, 'vehicle_data_bench']:
+            cursor.execute(f'DROP TABLE IF EXISTS public.{table}')
+        text_columns = ', '.join(f'"{column}" TEXT' for column in VEHICLE_DATA_COLUMNS)
+        cursor.execute(f'CREATE TABLE public.vehicle_data_bench ({text_columns})')
+    connection.commit()
+    store.create_tables()
+
+    start = time.perf_counter()
+    for rows in batches:
+        batch = ListingBatch()
+        batch.extend(rows)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY public.vehicle_data_bench FROM STDIN WITH {COPY_OPTIONS}', batch.to_csv())
+        connection.commit()
+    append_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for rows in batches:
+        batch = ListingBatch()
+        batch.extend(rows)
+        store.upsert(batch)
+    store_seconds = time.perf_counter() - start
+
+    with connection.cursor() as cursor:
+        sizes = {}
+        for table in ['vehicle_data_bench', store.listings_table, store.observations_table]:
+            cursor.execute('SELECT pg_total_relation_size(%s)', (f'public.{table}',))
+            sizes[table] = cursor.fetchone()[0]
+    connection.close()
+    return append_seconds, store_seconds, sizes
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the listing store against append-only vehicle_data")
+    parser.add_argument('--inventory', type=int, default=20_000, help="listings on the market at any time")
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--seen-fraction', type=float, default=0.6, help="share of the inventory scraped each day")
+    parser.add_argument('--turnover', type=float, default=0.03, help="share of the inventory sold and replaced each day")
+    parser.add_argument('--database', action='store_true', help="also load both layouts into '_bench' tables on PostgreSQL")
+    args = parser.parse_args()
+
+    batches = list(simulate_scrapes(args.inventory, args.days, args.seen_fraction, args.turnover, random.Random(0)))
+    scraped_rows = sum(len(rows) for rows in batches)
+
+    # Client-side cost up to the same point on both sides: the CSV handed to COPY.
+    # This is not ingest; --database measures loading into PostgreSQL. Both sides
+    # start from rows as the pipeline produces them, parsed into a ListingBatch.
+    append_bytes = 0
+    start = time.perf_counter()
+    for rows in batches:
+        batch = ListingBatch()
+        batch.extend(rows)
+        append_bytes += len(batch.to_csv().getvalue())
+    append_seconds = time.perf_counter() - start
+
+    current = {}
+    listings = {}
+    observation_count = 0
+    observation_bytes = 0
+    start = time.perf_counter()
+    for rows in batches:
+        batch = ListingBatch()
+        batch.extend(rows)
+        batch_listings, batch_observations = plan_upsert(batch, current)
+        to_csv(batch_listings)
+        observation_bytes += len(to_csv(batch_observations).getvalue())
+        observation_count += len(batch_observations)
+        listings.update((listing[0], listing) for listing in batch_listings)
+    store_seconds = time.perf_counter() - start
+
+    # Stored size: every appended row vs the final listings plus all observations
+    store_bytes = len(to_csv(listings.values()).getvalue()) + observation_bytes
+    print(f"Scraped rows: {scraped_rows:,} over {args.days} days")
+    print(f"Append-only:   {scraped_rows:>10,} rows  {append_bytes / 1e6:8.1f} MB")
+    print(f"Listing store: {len(listings):>10,} listings + {observation_count:,} observations  {store_bytes / 1e6:8.1f} MB")
+    print(f"Client-side prep to COPY CSV (not ingest): append (parse + CSV) {scraped_rows / append_seconds:,.0f} rows/s, "
+          f"listing store (parse + plan + CSV) {scraped_rows / store_seconds:,.0f} rows/s")
+    print(f"Storage reduction: {1 - store_bytes / append_bytes:.1%}")
+
+    if args.database:
+        append_seconds, store_seconds, sizes = load_database(batches)
+        print(f"\nPostgreSQL ingest: append {scraped_rows / append_seconds:,.0f} rows/s, listing store {scraped_rows / store_seconds:,.0f} rows/s")
+        for table, size in sizes.items():
+            print(f"  {table:<40} {size / 1e6:8.1f} MB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from maintenance_enrichment import MAKE_LEVEL_MODEL, MaintenanceIndex, build_maintenance_table, enrich_listings
+
+# Benchmarks the maintenance enrichment on synthetic listings against a
+# straightforward pandas version (normalize every row, two merges, combine).
+
+MAKES = ["toyota", "ford", "chevrolet", "honda", "nissan", "hyundai", "subaru", "kia",
+         "mercedes-benz", "bmw", "volkswagen", "audi", "mazda", "dodge", "lexus"]
+YEARS = range(2005, 2025)
+
+def make_maintenance_data(models_per_make, rng):
+    rows = []
+    for make in MAKES:
+        for model in [MAKE_LEVEL_MODEL] + [f"model-{i}" for i in range(models_per_make)]:
+            for year in YEARS:
+                rows.append((make, model, str(year), f"{rng.uniform(5, 60):.1f}%", f"${rng.integers(300, 2500):,}"))
+    return pd.DataFrame(rows, columns=['Brand', 'Model', 'Year', 'MajorRepairProbability', 'AnnualCosts'])
+
+def make_listings(num_rows, models_per_make, rng):
+    # NHTSA-style names; a third of the models have no model-level maintenance row
+    makes = np.array([make.upper() for make in MAKES])
+    models = np.array([f"Model {i}" for i in range(int(models_per_make * 1.5))])
+    return pd.DataFrame({
+        'VIN': np.arange(num_rows).astype(str),
+        'Make': makes[rng.integers(0, len(makes), num_rows)],
+        'Model': models[rng.integers(0, len(models), num_rows)],
+        'Year': rng.integers(2003, 2025, num_rows).astype(str),
+    })
+
+def naive_enrich(df, raw_df):
+    table = build_maintenance_table(raw_df)
+    listings = df.assign(
+        MakeKey=df['Make'].str.lower().str.replace(r'[^a-z0-9]+', '-', regex=True).str.strip('-'),
+        ModelKey=df['Model'].str.lower().str.replace(r'[^a-z0-9]+', '-', regex=True).str.strip('-'),
+        YearKey=pd.to_numeric(df['Year'], errors='coerce'),
+    )
+    model_level = table[table['ModelKey'] != ''].rename(columns={'Year': 'YearKey'})
+    make_level = table[table['ModelKey'] == ''].drop(columns='ModelKey').rename(columns={'Year': 'YearKey'})
+
+    merged = listings.merge(model_level, on=['MakeKey', 'ModelKey', 'YearKey'], how='left')
+    merged = merged.merge(make_level, on=['MakeKey', 'YearKey'], how='left', suffixes=('', 'Make'))
+    merged['ExpectedAnnualCost'] = merged['AnnualCost'].combine_first(merged['AnnualCostMake'])
+    merged['MajorRepairProbability'] = merged['MajorRepairProbability'].combine_first(merged['MajorRepairProbabilityMake'])
+    return merged
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the maintenance-cost enrichment join")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument('--models-per-make', type=int, default=40)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    raw_df = make_maintenance_data(args.models_per_make, rng)
+    index, build_seconds = timed(MaintenanceIndex.from_raw, raw_df)
+    print(f"Maintenance rows: {len(raw_df):,}, index build: {build_seconds * 1000:.1f} ms")
+
+    for num_rows in args.rows:
+        df = make_listings(num_rows, args.models_per_make, rng)
+        enriched, indexed_seconds = timed(enrich_listings, df, index)
+        expected, naive_seconds = timed(naive_enrich, df, raw_df)
+
+        assert np.allclose(enriched['ExpectedAnnualCost'], expected['ExpectedAnnualCost'], equal_nan=True)
+        matched = enriched['MaintenanceMatch'].notna().mean()
+        print(f"{num_rows:>12,} rows  index {indexed_seconds:7.2f} s ({num_rows / indexed_seconds:12,.0f} rows/s)  "
+              f"merge {naive_seconds:7.2f} s  speedup {naive_seconds / indexed_seconds:5.1f}x  matched {matched:.0%}")
+
+if __name__ == '__main__':
+    main()
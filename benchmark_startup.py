@@ -0,0 +1,87 @@
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+
+# Measures the cold-start cost of the scraper entry points with `python -X importtime`.
+# Each module is imported in a fresh interpreter so nothing is cached between runs.
+
+ENTRY_POINTS = [
+    'updated_cars_com_scraper_multiple_zips',
+    'updated_cars_com_scraper',
+    'scrape_maintenance_data',
+]
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+def measure_import_time(module, repeat=5):
+    here = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    imports = {}
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=here, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            print(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+            return None, {}
+
+        # A module's imports are printed before the module itself, two spaces deeper.
+        # Collect the lines one level below the top and keep them once the measured
+        # module's own line shows they were its direct imports (not site's, etc.).
+        children = {}
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            self_us, cumulative_us, indent, name = match.groups()
+            if len(indent) == 3:
+                children[name] = int(cumulative_us)
+            elif len(indent) == 1:
+                if name == module:
+                    runs.append(int(cumulative_us))
+                    for child, child_us in children.items():
+                        imports[child] = min(imports.get(child, float('inf')), child_us)
+                children = {}
+
+    return min(runs), imports
+
+def measure_resources():
+    # Time the first (cold) and second (warm) call of each cached resource
+    import scraper_resources
+
+    for name in ['get_http_session', 'get_zip_codes']:
+        func = getattr(scraper_resources, name)
+        start = time.perf_counter()
+        func()
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        func()
+        warm = time.perf_counter() - start
+        print(f"{name:<20} cold {cold * 1000:9.2f} ms   warm {warm * 1000:9.4f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time of the scraper entry points")
+    parser.add_argument('modules', nargs='*', default=ENTRY_POINTS)
+    parser.add_argument('--repeat', type=int, default=5, help="fresh interpreters per module, best run is reported")
+    parser.add_argument('--top', type=int, default=10, help="number of heaviest imports to list per module")
+    parser.add_argument('--resources', action='store_true', help="also time first and cached use of shared resources")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        total_us, imports = measure_import_time(module, args.repeat)
+        if total_us is None:
+            continue
+        print(f"\n{module}: {total_us / 1000:.1f} ms (best of {args.repeat})")
+        for name, cumulative_us in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+
+    if args.resources:
+        print()
+        measure_resources()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+import io
+import re
+import csv
+from array import array
+from datetime import datetime, timedelta
+from scraper_sources import VEHICLE_DATA_COLUMNS
+
+# Compact, typed, columnar batch of scraped listings. Price and mileage are
+# parsed to integers as rows are appended, repeated text (colors, drivetrain,
+# ZIP, ...) is dictionary-encoded, and numbers live in typed arrays rather than
+# one Python object per field. A batch goes straight to COPY (to_csv) or to
+# Arrow/Parquet (to_arrow, write_parquet) without an intermediate list of lists.
+
+# Columns stored as dictionary codes into a per-column list of distinct values
+DICTIONARY_COLUMNS = ["ExteriorColor", "InteriorColor", "Drivetrain", "FuelType", "Transmission", "Engine", "Source", "ZipLocation"]
+# High-cardinality text kept as plain lists
+TEXT_COLUMNS = ["CarName", "VIN"]
+# Integer columns; MISSING marks a value that wasn't on the page
+INTEGER_COLUMNS = ["CarPrice", "CarMileage"]
+MISSING = -1
+INT64_MAX = 2 ** 63 - 1
+
+NON_DIGITS = re.compile(r'[^\d]+')
+
+# Timestamps are stored as naive wall-clock microseconds since this epoch
+EPOCH = datetime(1970, 1, 1)
+
+def parse_integer(value):
+    # Digits of a scraped string as an int: "$28,800" -> 28800, "–" / "Not Priced" / None -> None
+    if value is None or isinstance(value, int):
+        return value
+    digits = NON_DIGITS.sub('', str(value))
+    return int(digits) if digits else None
+
+def parse_price(value):
+    # Cents are dropped: "$28,800.99" -> 28800
+    if isinstance(value, str):
+        value = value.split('.')[0]
+    return parse_integer(value)
+
+def parse_mileage(value):
+    # "57,487 mi." -> 57487
+    if isinstance(value, str):
+        value = value.replace('mi.', '')
+    return parse_integer(value)
+
+# NULL marker for COPY. None is written as \N so a scraped '' stays an empty string
+# rather than loading as NULL; use COPY_OPTIONS with every to_csv buffer.
+CSV_NULL = '\\N'
+COPY_OPTIONS = f"(FORMAT csv, NULL '{CSV_NULL}')"
+
+def to_csv(records):
+    # In-memory CSV for COPY ... FROM STDIN WITH COPY_OPTIONS
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in records:
+        writer.writerow([CSV_NULL if value is None else value for value in record])
+    buffer.seek(0)
+    return buffer
+
+class ListingBatch:
+    __slots__ = ('codes', 'dictionaries', '_lookups', 'text', 'integers', 'timestamps', 'decode_flags')
+
+    def __init__(self):
+        self.codes = {column: array('I') for column in DICTIONARY_COLUMNS}
+        self.dictionaries = {column: [] for column in DICTIONARY_COLUMNS}
+        self._lookups = {column: {} for column in DICTIONARY_COLUMNS}
+        self.text = {column: [] for column in TEXT_COLUMNS}
+        self.integers = {column: array('q') for column in INTEGER_COLUMNS}
+        self.timestamps = array('q')
+        self.decode_flags = array('b')
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, row):
+        # row is a vehicle_data dict as built by Source.to_row. Every value is parsed
+        # and checked before any column grows, so a bad row raises and leaves the
+        # batch as it was.
+        integers = {'CarPrice': parse_price(row['CarPrice']), 'CarMileage': parse_mileage(row['CarMileage'])}
+        for column, value in integers.items():
+            if value is None:
+                integers[column] = MISSING
+            elif not 0 <= value <= INT64_MAX:
+                raise OverflowError(f"{column} {value} doesn't fit in a 64-bit integer")
+        timestamp = (row['TimeStamp'] - EPOCH) // timedelta(microseconds=1)
+        texts = {column: row[column] for column in TEXT_COLUMNS}
+        values = {column: row[column] for column in DICTIONARY_COLUMNS}
+        codes = {column: self._lookups[column].get(value) for column, value in values.items()}
+        decode_flag = bool(row['DecodeFlag'])
+
+        for column, value in values.items():
+            code = codes[column]
+            if code is None:
+                code = self._lookups[column][value] = len(self.dictionaries[column])
+                self.dictionaries[column].append(value)
+            self.codes[column].append(code)
+        for column, value in texts.items():
+            self.text[column].append(value)
+        for column, value in integers.items():
+            self.integers[column].append(value)
+        self.timestamps.append(timestamp)
+        self.decode_flags.append(decode_flag)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def value(self, name, index):
+        # Decoded value of one column for the row at index
+        if name in self.codes:
+            return self.dictionaries[name][self.codes[name][index]]
+        if name in self.text:
+            return self.text[name][index]
+        if name in self.integers:
+            value = self.integers[name][index]
+            return None if value == MISSING else value
+        if name == 'TimeStamp':
+            return EPOCH + timedelta(microseconds=self.timestamps[index])
+        if name == 'DecodeFlag':
+            return bool(self.decode_flags[index])
+        raise KeyError(name)
+
+    def iter_column(self, name):
+        # Decoded values of one column, in row order, produced lazily
+        if name in self.codes:
+            values = self.dictionaries[name]
+            return (values[code] for code in self.codes[name])
+        if name in self.text:
+            return iter(self.text[name])
+        if name in self.integers:
+            return (None if value == MISSING else value for value in self.integers[name])
+        if name == 'TimeStamp':
+            return (EPOCH + timedelta(microseconds=value) for value in self.timestamps)
+        if name == 'DecodeFlag':
+            return (bool(value) for value in self.decode_flags)
+        raise KeyError(name)
+
+    def column(self, name):
+        return list(self.iter_column(name))
+
+    def records(self):
+        # Tuples in vehicle_data column order, one at a time
+        return zip(*(self.iter_column(name) for name in VEHICLE_DATA_COLUMNS))
+
+    def rows(self):
+        # vehicle_data dicts, one at a time
+        for record in self.records():
+            yield dict(zip(VEHICLE_DATA_COLUMNS, record))
+
+    def to_csv(self):
+        return to_csv(self.records())
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        arrays = []
+        for name in VEHICLE_DATA_COLUMNS:
+            if name in self.codes:
+                # Missing values become null indices; Parquet can't store a null inside the dictionary
+                values = self.dictionaries[name]
+                null_code = values.index(None) if None in values else None
+                indices = pa.array(self.codes[name], pa.uint32(), mask=[code == null_code for code in self.codes[name]])
+                dictionary = pa.array(['' if value is None else value for value in values], pa.string())
+                arrays.append(pa.DictionaryArray.from_arrays(indices, dictionary))
+            elif name in self.text:
+                arrays.append(pa.array(self.text[name], pa.string()))
+            elif name in self.integers:
+                values = self.integers[name]
+                arrays.append(pa.array(values, pa.int64(), mask=[value == MISSING for value in values]))
+            elif name == 'TimeStamp':
+                arrays.append(pa.array(self.timestamps, pa.int64()).cast(pa.timestamp('us')))
+            else:
+                arrays.append(pa.array(self.decode_flags, pa.int8()).cast(pa.bool_()))
+        return pa.Table.from_arrays(arrays, names=VEHICLE_DATA_COLUMNS)
+
+    def write_parquet(self, path):
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(), path)
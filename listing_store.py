@@ -0,0 +1,190 @@
+import logging
+from scraper_sources import VEHICLE_DATA_COLUMNS
+from listing_batch import COPY_OPTIONS, INTEGER_COLUMNS, ListingBatch, to_csv
+
+# Deduplicated listing store. vehicle_data appends a full row every time a VIN
+# is scraped; here each VIN is one row in vehicle_listings, and
+# vehicle_listing_observations only records the tracked fields that changed
+# (price, mileage, ZIP) with their timestamp. Observation ids double as a change
+# feed: each downstream stage keeps its own offset in listing_change_offsets
+# and only reads observations past it.
+
+# Fields whose changes are logged as observations
+TRACKED_COLUMNS = ["CarPrice", "CarMileage", "ZipLocation"]
+
+# Fields that describe the vehicle itself and are kept on the listing row
+DESCRIPTIVE_COLUMNS = [column for column in VEHICLE_DATA_COLUMNS if column not in TRACKED_COLUMNS + ["VIN", "TimeStamp", "DecodeFlag"]]
+
+LISTING_COLUMNS = ["VIN"] + DESCRIPTIVE_COLUMNS + TRACKED_COLUMNS + ["FirstSeen", "LastSeen"]
+OBSERVATION_COLUMNS = ["VIN", "TimeStamp", "IsNew"] + TRACKED_COLUMNS
+
+def plan_upsert(batch, current):
+    # Split a ListingBatch into listing upserts and change observations, reading the
+    # batch's columns directly in timestamp order.
+    # current maps VIN -> {tracked column: value} for VINs already stored and is
+    # updated in place. A tracked field that comes back empty is not a change, so a
+    # missing mileage never erases a known one; empty descriptive fields are kept
+    # from the stored listing by the COALESCE in ListingStore.upsert. Rows without
+    # a VIN are skipped.
+    listings = {}
+    observations = []
+
+    for index in sorted(range(len(batch)), key=batch.timestamps.__getitem__):
+        vin = batch.value('VIN', index)
+        if not vin:
+            continue
+        timestamp = batch.value('TimeStamp', index)
+        tracked = {column: batch.value(column, index) for column in TRACKED_COLUMNS}
+
+        state = current.get(vin)
+        if state is None:
+            current[vin] = dict(tracked)
+            observations.append(dict(tracked, VIN=vin, TimeStamp=timestamp, IsNew=True))
+        else:
+            changed = {column: value for column, value in tracked.items() if value is not None and value != state[column]}
+            if changed:
+                state.update(changed)
+                observations.append(dict(dict.fromkeys(TRACKED_COLUMNS), **changed, VIN=vin, TimeStamp=timestamp, IsNew=False))
+
+        listing = listings.setdefault(vin, {'VIN': vin, 'FirstSeen': timestamp})
+        for column in DESCRIPTIVE_COLUMNS:
+            value = batch.value(column, index)
+            if value is not None:
+                listing[column] = value
+        listing.update(current[vin])
+        listing['LastSeen'] = timestamp
+
+    return [tuple(listing.get(column) for column in LISTING_COLUMNS) for listing in listings.values()], \
+        [tuple(observation[column] for column in OBSERVATION_COLUMNS) for observation in observations]
+
+def quote_columns(columns, prefix=''):
+    return ', '.join(f'{prefix}"{column}"' for column in columns)
+
+class ListingStore:
+    def __init__(self, connection, suffix=''):
+        # suffix selects parallel tables, e.g. '_test_env' in test mode
+        self.connection = connection
+        self.listings_table = f'vehicle_listings{suffix}'
+        self.observations_table = f'vehicle_listing_observations{suffix}'
+        self.offsets_table = f'listing_change_offsets{suffix}'
+
+    def create_tables(self):
+        # Price and mileage are integers, as parsed by ListingBatch; everything else is text
+        def column_definitions(columns):
+            return ', '.join(f'"{column}" {"BIGINT" if column in INTEGER_COLUMNS else "TEXT"}' for column in columns)
+
+        listing_columns = column_definitions(DESCRIPTIVE_COLUMNS + TRACKED_COLUMNS)
+        tracked_columns = column_definitions(TRACKED_COLUMNS)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS public.{self.listings_table} (
+                    "VIN" TEXT PRIMARY KEY, {listing_columns},
+                    "FirstSeen" TIMESTAMP NOT NULL, "LastSeen" TIMESTAMP NOT NULL
+                )
+            """)
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS public.{self.observations_table} (
+                    "ObservationId" BIGSERIAL PRIMARY KEY, "VIN" TEXT NOT NULL,
+                    "TimeStamp" TIMESTAMP NOT NULL, "IsNew" BOOLEAN NOT NULL,
+                    {tracked_columns}
+                )
+            """)
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS public.{self.offsets_table} (
+                    "Consumer" TEXT PRIMARY KEY, "LastObservationId" BIGINT NOT NULL
+                )
+            """)
+        self.connection.commit()
+
+    def current_state(self, cursor, vins):
+        cursor.execute(
+            f'SELECT {quote_columns(["VIN"] + TRACKED_COLUMNS)} FROM public.{self.listings_table} WHERE "VIN" = ANY(%s) FOR UPDATE',
+            (list(vins),)
+        )
+        return {record[0]: dict(zip(TRACKED_COLUMNS, record[1:])) for record in cursor.fetchall()}
+
+    def upsert(self, rows):
+        # Bulk upsert of a ListingBatch (or vehicle_data dicts, packed into one). Returns (listings written, observations written).
+        from psycopg2.extras import execute_values
+
+        if isinstance(rows, ListingBatch):
+            batch = rows
+        else:
+            batch = ListingBatch()
+            batch.extend(rows)
+        updates = ', '.join(
+            f'"{column}" = COALESCE(EXCLUDED."{column}", public.{self.listings_table}."{column}")' if column in DESCRIPTIVE_COLUMNS
+            else f'"{column}" = EXCLUDED."{column}"'
+            for column in LISTING_COLUMNS if column not in ('VIN', 'FirstSeen')
+        )
+
+        with self.connection.cursor() as cursor:
+            # One writer at a time: observation ids are then handed out in commit order,
+            # so a consumer that has moved past an id can never see a lower one commit later
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', (f'public.{self.observations_table}',))
+            current = self.current_state(cursor, {vin for vin in batch.iter_column('VIN') if vin})
+            listings, observations = plan_upsert(batch, current)
+
+            execute_values(cursor, f"""
+                INSERT INTO public.{self.listings_table} ({quote_columns(LISTING_COLUMNS)}) VALUES %s
+                ON CONFLICT ("VIN") DO UPDATE SET {updates}
+            """, listings, page_size=1000)
+            cursor.copy_expert(
+                f'COPY public.{self.observations_table} ({quote_columns(OBSERVATION_COLUMNS)}) FROM STDIN WITH {COPY_OPTIONS}',
+                to_csv(observations)
+            )
+        self.connection.commit()
+
+        logging.info(f"Upserted {len(listings)} listings, logged {len(observations)} observations from {len(batch)} scraped rows")
+        return len(listings), len(observations)
+
+    def read_changes(self, consumer, limit=None):
+        # Observations this consumer hasn't processed yet, oldest first, as dicts
+        columns = ["ObservationId"] + OBSERVATION_COLUMNS
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT {quote_columns(columns, 'o.')}
+                FROM public.{self.observations_table} o
+                WHERE o."ObservationId" > COALESCE(
+                    (SELECT "LastObservationId" FROM public.{self.offsets_table} WHERE "Consumer" = %s), 0)
+                ORDER BY o."ObservationId"
+                {'LIMIT %s' if limit else ''}
+            """, (consumer, limit) if limit else (consumer,))
+            changes = [dict(zip(columns, record)) for record in cursor.fetchall()]
+        # End the read transaction so the connection doesn't sit idle in one while the consumer works
+        self.connection.commit()
+        return changes
+
+    def read_changed_listings(self, consumer):
+        # Current vehicle_data-shaped row for every listing with unprocessed changes, stamped
+        # with its latest observation time, plus the id to pass to commit_changes afterwards.
+        # Observations only carry price, mileage and ZIP, so the rest comes from the listing.
+        changes = self.read_changes(consumer)
+        if not changes:
+            return [], None
+
+        latest = {}
+        for change in changes:
+            latest[change['VIN']] = change['TimeStamp']
+
+        columns = ["VIN"] + DESCRIPTIVE_COLUMNS + TRACKED_COLUMNS
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT {quote_columns(columns)} FROM public.{self.listings_table} WHERE "VIN" = ANY(%s)',
+                (list(latest),)
+            )
+            listings = [dict(zip(columns, record)) for record in cursor.fetchall()]
+        self.connection.commit()
+
+        rows = [dict(listing, TimeStamp=latest[listing['VIN']], DecodeFlag=False) for listing in listings]
+        return [{column: row[column] for column in VEHICLE_DATA_COLUMNS} for row in rows], changes[-1]['ObservationId']
+
+    def commit_changes(self, consumer, last_observation_id):
+        # Mark everything up to last_observation_id as processed for this consumer
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO public.{self.offsets_table} ("Consumer", "LastObservationId") VALUES (%s, %s)
+                ON CONFLICT ("Consumer") DO UPDATE SET "LastObservationId" = GREATEST(
+                    public.{self.offsets_table}."LastObservationId", EXCLUDED."LastObservationId")
+            """, (consumer, last_observation_id))
+        self.connection.commit()
@@ -0,0 +1,135 @@
+import os
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+# Joins caredge maintenance costs (car_maintenance_data) onto NHTSA-decoded
+# listings (cleaned_vehicle_data). caredge keys are URL slugs ("mercedes-benz",
+# "cr-v") while NHTSA uses display names ("MERCEDES-BENZ", "CR-V"), so both
+# sides are reduced to the same normalized slug before matching.
+
+load_dotenv()
+
+mode = os.getenv('MODE')
+
+# Model name caredge uses for make-level rows (see scrape_maintenance_data.py)
+MAKE_LEVEL_MODEL = "All Models"
+
+def normalize_key(values):
+    # Lowercase slug with runs of non-alphanumerics collapsed to '-'.
+    # Only the unique values are normalized, which keeps this cheap on millions of rows.
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    normalized = (
+        pd.Series(uniques, dtype=object).astype(str).str.lower()
+        .str.replace(r'[^a-z0-9]+', '-', regex=True).str.strip('-')
+        .to_numpy(dtype=object)
+    )
+    return np.where(codes < 0, '', normalized[codes]) if len(normalized) else np.full(len(codes), '', dtype=object)
+
+def parse_number(values):
+    # "$1,234" -> 1234.0, "25.4%" -> 25.4, anything unparseable -> NaN
+    cleaned = pd.Series(values, dtype=object).astype(str).str.replace(r'[^\d.]+', '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype=float)
+
+def build_maintenance_table(raw_df):
+    # Typed maintenance table from the scraped strings, one row per normalized key and year
+    table = pd.DataFrame({
+        'MakeKey': normalize_key(raw_df['Brand']),
+        'ModelKey': normalize_key(raw_df['Model']),
+        'Year': parse_number(raw_df['Year']),
+        'MajorRepairProbability': parse_number(raw_df['MajorRepairProbability']) / 100,
+        'AnnualCost': parse_number(raw_df['AnnualCosts']),
+    })
+    table.loc[raw_df['Model'].to_numpy() == MAKE_LEVEL_MODEL, 'ModelKey'] = ''
+    table = table.dropna(subset=['Year'])
+    table['Year'] = table['Year'].astype('int32')
+
+    # Repeated scrapes of the same key are averaged
+    return table.groupby(['MakeKey', 'ModelKey', 'Year'], sort=True).mean().reset_index()
+
+class MaintenanceIndex:
+    def __init__(self, table):
+        model_level = table[table['ModelKey'] != '']
+        make_level = table[table['ModelKey'] == '']
+
+        self.model_index = pd.MultiIndex.from_frame(model_level[['MakeKey', 'ModelKey', 'Year']])
+        self.model_values = model_level[['AnnualCost', 'MajorRepairProbability']].to_numpy(dtype=float)
+        self.make_index = pd.MultiIndex.from_frame(make_level[['MakeKey', 'Year']])
+        self.make_values = make_level[['AnnualCost', 'MajorRepairProbability']].to_numpy(dtype=float)
+
+    @classmethod
+    def from_raw(cls, raw_df):
+        return cls(build_maintenance_table(raw_df))
+
+    def lookup(self, make_keys, model_keys, years):
+        # Returns (values, match level) for each listing: model-level first, make-level as fallback
+        values = np.full((len(years), 2), np.nan)
+        match = np.full(len(years), None, dtype=object)
+
+        model_positions = self.model_index.get_indexer(pd.MultiIndex.from_arrays([make_keys, model_keys, years])) if len(self.model_index) else np.full(len(years), -1)
+        found = model_positions >= 0
+        values[found] = self.model_values[model_positions[found]]
+        match[found] = 'model'
+
+        missing = ~found
+        if missing.any() and len(self.make_index):
+            make_positions = self.make_index.get_indexer(pd.MultiIndex.from_arrays([make_keys[missing], years[missing]]))
+            make_found = make_positions >= 0
+            rows = np.flatnonzero(missing)[make_found]
+            values[rows] = self.make_values[make_positions[make_found]]
+            match[rows] = 'make'
+
+        return values, match
+
+def enrich_listings(df, index):
+    # Adds ExpectedAnnualCost, MajorRepairProbability and MaintenanceMatch to cleaned listings.
+    # Listings repeat a small set of make/model/year combinations, so each column is
+    # factorized and only the distinct combinations are normalized and looked up.
+    make_codes, makes = pd.factorize(df['Make'])
+    model_codes, models = pd.factorize(df['Model'])
+    year_codes, years = pd.factorize(df['Year'])
+
+    # One int64 per row encoding (make, model, year) codes; -1 (missing) is shifted to 0
+    combined = ((make_codes.astype('int64') + 1) * (len(models) + 1) + model_codes + 1) * (len(years) + 1) + year_codes + 1
+    combo_codes, combos = pd.factorize(combined)
+    combo_years = combos % (len(years) + 1)
+    combo_models = (combos // (len(years) + 1)) % (len(models) + 1)
+    combo_makes = combos // (len(years) + 1) // (len(models) + 1)
+
+    # Index 0 holds the key for missing values
+    make_keys = np.append('', normalize_key(makes))[combo_makes]
+    model_keys = np.append('', normalize_key(models))[combo_models]
+    year_values = np.append(-1, pd.to_numeric(pd.Series(years, dtype=object), errors='coerce').fillna(-1).to_numpy(dtype='int64'))[combo_years]
+    values, match = index.lookup(make_keys, model_keys, year_values)
+
+    df = df.copy()
+    df['ExpectedAnnualCost'] = values[combo_codes, 0]
+    df['MajorRepairProbability'] = values[combo_codes, 1]
+    df['MaintenanceMatch'] = match[combo_codes]
+    return df
+
+def create_db_engine():
+    from sqlalchemy import create_engine
+
+    dbname = os.getenv('PROD_DB_NAME')
+    user = os.getenv('PROD_DB_USER')
+    password = os.getenv('PROD_DB_PASS')
+    host = os.getenv('PROD_DB_HOST')
+    return create_engine(f'postgresql://{user}:{password}@{host}/{dbname}')
+
+def main():
+    engine = create_db_engine()
+
+    # Define table names based on mode
+    cleaned_data_table = 'cleaned_vehicle_data_test_env' if mode == 'test' else 'cleaned_vehicle_data'
+    enriched_data_table = 'enriched_vehicle_data_test_env' if mode == 'test' else 'enriched_vehicle_data'
+
+    index = MaintenanceIndex.from_raw(pd.read_sql('SELECT * FROM car_maintenance_data', engine))
+    df = enrich_listings(pd.read_sql(f'SELECT * FROM {cleaned_data_table}', engine), index)
+    df.to_sql(enriched_data_table, engine, if_exists='replace', index=False)
+
+    matched = df['MaintenanceMatch'].value_counts()
+    print(f"Enriched {len(df)} listings ({matched.get('model', 0)} model-level, {matched.get('make', 0)} make-level matches). Loaded to: {enriched_data_table}")
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,9 @@
 import requests
 from bs4 import BeautifulSoup
-import psycopg2
-from psycopg2 import sql
 import os
-from fake_useragent import UserAgent
 from dotenv import load_dotenv
 import logging
+from scraper_resources import random_user_agent
 
 # Load environment variables
 load_dotenv()
@@ -19,13 +17,12 @@ DB_HOST = os.getenv('PROD_DB_HOST')
 brands = ["toyota", "ford", "chevrolet", "honda", "nissan", "hyundai", "subaru", "kia", 
           "mercedes-benz", "bmw", "volkswagen", "audi", "mazda", "dodge", "lexus"]
 
-# Initialize User Agent and logging
-ua = UserAgent()
+# Initialize logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
 def get_model_urls(brand):
     brand_url = f"https://caredge.com/{brand}/maintenance"
-    headers = {'User-Agent': ua.random}
+    headers = {'User-Agent': random_user_agent()}
     model_urls = []
 
     try:
@@ -45,7 +42,7 @@ def get_model_urls(brand):
 
 def get_maintenance_data(url_suffix, is_make_level=False):
     url = f"https://caredge.com{url_suffix}"
-    headers = {'User-Agent': ua.random}
+    headers = {'User-Agent': random_user_agent()}
     data = []
 
     try:
@@ -73,6 +70,9 @@ def get_maintenance_data(url_suffix, is_make_level=False):
     return data
 
 def insert_into_database(data):
+    import psycopg2
+    from psycopg2 import sql
+
     with psycopg2.connect(dbname=DB_NAME, user=DB_USER, password=DB_PASS, host=DB_HOST) as connection:
         with connection.cursor() as cursor:
             insert_query = sql.SQL("""
@@ -0,0 +1,116 @@
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from scraper_resources import get_http_session, random_user_agent
+from listing_batch import ListingBatch
+
+# Shared fetch/parse pipeline for every registered source. Each source gets its
+# own worker pool sized to its max_concurrency, so adding a source adds
+# throughput instead of another serial run. VINs are deduplicated across all
+# sources and ZIP codes within a run.
+
+class ScrapePipeline:
+    def __init__(self, sources, http_retries=1):
+        self.sources = sources
+        self.http = get_http_session(http_retries, pool_maxsize=max(10, sum(source.max_concurrency for source in sources)))
+        self._seen_vins = set()
+        self._seen_lock = threading.Lock()
+
+    def claim_vin(self, vin):
+        # True the first time a VIN is seen in this run, False for every duplicate
+        with self._seen_lock:
+            if vin in self._seen_vins:
+                return False
+            self._seen_vins.add(vin)
+            return True
+
+    def fetch(self, source, url):
+        import requests
+        from bs4 import BeautifulSoup
+
+        headers = {'User-Agent': random_user_agent()}
+        try:
+            response = self.http.get(url, headers=headers, timeout=10)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logging.error(f"Request to {url} failed: {e}")
+            return None
+        finally:
+            time.sleep(random.uniform(*source.request_delay))  # Random delay
+
+        return BeautifulSoup(response.content, 'html.parser')
+
+    def scrape_search_page(self, source, page_number, zip_code):
+        try:
+            soup = self.fetch(source, source.search_url(page_number, zip_code))
+            if not soup:
+                return []
+            return list(source.parse_cards(soup))
+        except Exception as e:
+            logging.error(f"Error processing {source.name} search page {page_number} for ZIP code {zip_code}: {e}")
+            return []
+
+    def scrape_listing(self, source, card, zip_code):
+        try:
+            soup = self.fetch(source, card['url'])
+            if not soup:
+                return None
+            row = source.to_row(card, source.parse_detail(soup), zip_code)
+        except Exception as e:
+            logging.error(f"Error processing {source.name} listing {card.get('url')}: {e}")
+            return None
+
+        # Cards without a VIN are deduplicated once the detail page reveals it
+        if not card.get('VIN') and row['VIN'] and not self.claim_vin(row['VIN']):
+            return None
+        return row
+
+    def run(self, zip_codes, pages_per_zip):
+        from tqdm import tqdm
+
+        executors = {source.name: ThreadPoolExecutor(max_workers=source.max_concurrency, thread_name_prefix=source.name) for source in self.sources}
+        pending = {}
+        rows = ListingBatch()
+        duplicates = 0
+
+        progress = tqdm(total=len(self.sources) * len(zip_codes) * pages_per_zip, desc="Pages and listings")
+        try:
+            for source in self.sources:
+                for zip_code in zip_codes:
+                    for page_number in range(1, pages_per_zip + 1):
+                        future = executors[source.name].submit(self.scrape_search_page, source, page_number, zip_code)
+                        pending[future] = (source, zip_code, True)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source, zip_code, is_search_page = pending.pop(future)
+                    progress.update(1)
+
+                    if not is_search_page:
+                        row = future.result()
+                        if row is not None:
+                            # A value the batch can't store costs this listing, not the run
+                            try:
+                                rows.append(row)
+                            except Exception as e:
+                                logging.error(f"Skipping {source.name} listing {row.get('VIN')} from ZIP code {zip_code}: {e}")
+                        continue
+
+                    for card in future.result():
+                        if card.get('VIN') and not self.claim_vin(card['VIN']):
+                            duplicates += 1
+                            continue
+                        listing = executors[source.name].submit(self.scrape_listing, source, card, zip_code)
+                        pending[listing] = (source, zip_code, False)
+                        progress.total += 1
+                    progress.refresh()
+        finally:
+            progress.close()
+            for executor in executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        logging.info(f"Scraped {len(rows)} listings from {len(self.sources)} sources, skipped {duplicates} duplicate VINs before fetching details")
+        return rows
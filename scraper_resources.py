@@ -0,0 +1,87 @@
+import os
+import random
+import logging
+from functools import lru_cache
+
+# Shared, lazily-created resources for the scraper entry points.
+# Nothing heavy happens at import time: the HTTP session, the uszipcode
+# database and the ZIP code list are built on first use and cached for the
+# life of the process, so warm invocations (Lambda, --warm-start) reuse them.
+
+# Bundled user agents, used instead of fake_useragent so we never load or fetch its data
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36 Edg/123.0.2420.81",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Safari/605.1.15",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14.4; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.6367.82 Mobile Safari/537.36",
+]
+
+# On-disk copy of the ZIP code list so repeated runs can skip the uszipcode database entirely
+ZIP_CODE_CACHE = os.getenv('ZIP_CODE_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.zip_code_cache'))
+
+def random_user_agent():
+    return random.choice(USER_AGENTS)
+
+@lru_cache(maxsize=None)
+def get_http_session(total_retries=1, pool_maxsize=10):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.packages.urllib3.util.retry import Retry
+
+    # Setup retry strategy
+    retry_strategy = Retry(
+        total=total_retries,
+        status_forcelist=[429, 500, 502, 503, 504],
+        method_whitelist=["HEAD", "GET", "OPTIONS"],
+        backoff_factor=1
+    )
+
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    http = requests.Session()
+    http.mount("https://", adapter)
+    http.mount("http://", adapter)
+    return http
+
+@lru_cache(maxsize=None)
+def get_search_engine():
+    from uszipcode import SearchEngine
+    return SearchEngine()
+
+def load_cached_zip_codes(path=ZIP_CODE_CACHE):
+    try:
+        with open(path) as f:
+            return [line.strip() for line in f if line.strip()]
+    except OSError:
+        return []
+
+def save_cached_zip_codes(zip_codes, path=ZIP_CODE_CACHE):
+    try:
+        with open(path, 'w') as f:
+            f.write('\n'.join(zip_codes))
+    except OSError as e:
+        logging.warning(f"Could not write ZIP code cache to {path}: {e}")
+
+@lru_cache(maxsize=None)
+def get_zip_codes():
+    zip_codes = load_cached_zip_codes()
+    if zip_codes:
+        return tuple(zip_codes)
+
+    logging.info("ZIP code cache is empty, loading ZIP codes from uszipcode")
+    zip_codes = [z.zipcode for z in get_search_engine().by_city_and_state(city=None, state=None, returns=42724)]
+    save_cached_zip_codes(zip_codes)
+    return tuple(zip_codes)
+
+def get_random_zip_code():
+    return random.choice(get_zip_codes())
+
+def warm_up():
+    # Build every cached resource up front, e.g. before the first timed invocation
+    get_http_session()
+    get_zip_codes()
@@ -0,0 +1,104 @@
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+# Marketplace plugins for the scrape pipeline. A source knows how to build its
+# search-page URLs, parse listing cards and detail pages, and map what it finds
+# onto the vehicle_data schema. Fetching, concurrency, dedup and loading are
+# handled once for every source by scrape_pipeline.ScrapePipeline.
+
+# Columns of the vehicle_data table, in insert order
+VEHICLE_DATA_COLUMNS = [
+    "CarName", "CarPrice", "CarMileage", "ExteriorColor",
+    "InteriorColor", "Drivetrain", "FuelType", "Transmission",
+    "Engine", "VIN", "TimeStamp", "Source", "ZipLocation", "DecodeFlag"
+]
+
+SOURCES = {}
+
+def register_source(cls):
+    if not cls.name:
+        raise TypeError(f"{cls.__name__} must set name before it can be registered")
+    if cls.name in SOURCES:
+        raise TypeError(f"Source name {cls.name!r} is already registered by {SOURCES[cls.name].__name__}")
+    SOURCES[cls.name] = cls
+    return cls
+
+def get_sources(names=None):
+    names = names or list(SOURCES)
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown source(s) {', '.join(map(repr, unknown))} (choose from {', '.join(map(repr, SOURCES))})")
+    return [SOURCES[name]() for name in names]
+
+class Source(ABC):
+    # Value written to the "Source" column, also the registry key
+    name = None
+    # Maximum number of requests this source may have in flight at once
+    max_concurrency = 4
+    # Random delay in seconds after each request, per worker
+    request_delay = (1, 3)
+    # Detail-page labels mapped to vehicle_data columns
+    field_mapping = {}
+
+    @abstractmethod
+    def search_url(self, page_number, zip_code):
+        raise NotImplementedError
+
+    @abstractmethod
+    def parse_cards(self, soup):
+        # Yield one dict per listing card. Each card needs a 'url' for its detail page
+        # and may carry any vehicle_data column; a 'VIN' lets the pipeline skip the
+        # detail fetch for listings it has already seen.
+        raise NotImplementedError
+
+    @abstractmethod
+    def parse_detail(self, soup):
+        # Return the raw label -> value pairs found on a listing detail page
+        raise NotImplementedError
+
+    def to_row(self, card, detail, zip_code):
+        row = dict.fromkeys(VEHICLE_DATA_COLUMNS)
+        row.update({column: value for column, value in card.items() if column in row})
+        for label, column in self.field_mapping.items():
+            if label in detail:
+                row[column] = detail[label]
+
+        row['TimeStamp'] = datetime.now()
+        row['Source'] = self.name
+        row['ZipLocation'] = zip_code
+        row['DecodeFlag'] = False
+        return row
+
+@register_source
+class CarsComSource(Source):
+    name = "Cars.com"
+    base_url = "https://www.cars.com"
+    field_mapping = {
+        'Mileage': 'CarMileage',
+        'Exterior color': 'ExteriorColor',
+        'Interior color': 'InteriorColor',
+        'Drivetrain': 'Drivetrain',
+        'Fuel type': 'FuelType',
+        'Transmission': 'Transmission',
+        'Engine': 'Engine',
+        'VIN': 'VIN',
+    }
+
+    def search_url(self, page_number, zip_code):
+        return f"{self.base_url}/shopping/results/?page={page_number}&zip={zip_code}"
+
+    def parse_cards(self, soup):
+        for car_listing in soup.find_all('div', class_='vehicle-card-main js-gallery-click-card'):
+            try:
+                yield {
+                    'CarName': car_listing.find('h2', class_='title').text.strip(),
+                    'CarPrice': car_listing.find('span', class_='primary-price').text.strip(),
+                    'url': self.base_url + car_listing.find('a')['href'],
+                }
+            except (AttributeError, KeyError, TypeError) as e:
+                logging.error(f"Error processing car listing: {e}")
+
+    def parse_detail(self, soup):
+        car_specs = soup.find('dl', class_='fancy-description-list')
+        return {term.text.strip(): desc.text.strip() for term, desc in zip(car_specs.find_all('dt'), car_specs.find_all('dd')) if term.text.strip() in self.field_mapping}